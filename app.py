@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime
 from llm_assistant import show_llm_assistant
+from nutrients import UnitType, parse_unit_type
 from database import (
     fetch_brands, fetch_food_library, add_brand, add_food_to_library, 
     log_food_consumed, fetch_food_log
@@ -26,7 +27,7 @@ log_date = st.date_input("Date to log food for:", value=datetime.now().date())
 log_date_str = log_date.strftime("%Y-%m-%d")
 
 # --- LLM Assistant Section ---
-show_llm_assistant()
+show_llm_assistant(log_date_str)
 
 st.markdown("---")
 
@@ -83,7 +84,7 @@ if food_choice == "Add new item...":
     st.info(f"Add a new food or drink to your library for brand '{selected_brand_name}' and log it as consumed.")
     
     # Unit type selection outside form for dynamic updates
-    unit_type = st.selectbox("How is this item measured?", ["unit", "weight (g)"], key="unit_type_select")
+    unit_type = st.selectbox("How is this item measured?", [u.value for u in UnitType], key="unit_type_select")
     
     with st.form("add_food_form"):
         name = st.text_input("Name (e.g. Chicken Breast, Beer)")
@@ -91,7 +92,7 @@ if food_choice == "Add new item...":
         st.write(f"Measurement type: **{unit_type}**")
         
         # Dynamic serving size and labels based on unit type
-        if unit_type == "weight (g)":
+        if unit_type == UnitType.WEIGHT_G:
             serving_size = st.text_input("Serving size (reference)", value="100g", disabled=True)
             carbs = st.number_input("Carbs per 100g/100ml", min_value=0.0, value=0.0)
             protein = st.number_input("Protein per 100g/100ml", min_value=0.0, value=0.0)
@@ -125,7 +126,7 @@ elif food_choice and food_choice != "Add new item...":
     selected_food = next((f for f in filtered_foods if f["name"] == food_choice), None)
     if selected_food:
         with st.form("log_existing_food_form"):
-            if selected_food.get("unit_type", "unit") == "unit":
+            if parse_unit_type(selected_food["unit_type"]) == UnitType.UNIT:
                 quantity = st.number_input(f"How many units of '{food_choice}' did you consume?", min_value=0.0, value=1.0)
             else:
                 quantity = st.number_input(f"How many grams of '{food_choice}' did you consume? (per 100g macros)", min_value=0.0, value=0.0)
@@ -1,6 +1,8 @@
 import streamlit as st
+import threading
 from streamlit_supabase_connect import get_supabase_client
 from datetime import datetime
+from nutrients import parse_unit_type
 
 # Initialize Supabase client
 @st.cache_resource
@@ -9,6 +11,22 @@ def get_db_client():
 
 sb = get_db_client()
 
+# Per-day write counters for food_log, bumped on every insert/delete so that
+# cached per-day results (see nutrition_trends.py) know when to recompute.
+# Sessions run on separate threads, so changes go through get_log_lock()
+@st.cache_resource
+def get_log_versions():
+    return {}
+
+@st.cache_resource
+def get_log_lock():
+    return threading.Lock()
+
+def bump_log_version(date):
+    with get_log_lock():
+        versions = get_log_versions()
+        versions[date] = versions.get(date, 0) + 1
+
 # --- Database Functions ---
 def fetch_brands():
     result = sb.table("brands").select("*").order("name", desc=False).execute()
@@ -24,6 +42,7 @@ def add_brand(name):
     return result.data[0] if result.data else None
 
 def add_food_to_library(name, carbs, protein, fat, alcohol, fibre, unit_type, serving_size, brand_id):
+    unit_type = parse_unit_type(unit_type)
     data = {
         "name": name,
         "carbs_g": carbs,
@@ -31,7 +50,7 @@ def add_food_to_library(name, carbs, protein, fat, alcohol, fibre, unit_type, se
         "fat_g": fat,
         "alcohol_g": alcohol,
         "fibre_g": fibre,
-        "unit_type": unit_type,
+        "unit_type": unit_type.value,
         "serving_size": serving_size,
         "brand_id": brand_id
     }
@@ -44,11 +63,19 @@ def fetch_food_log(date=None):
     result = sb.table("food_log").select("*,food_library(*,brands(*))").eq("date", date).order("id", desc=False).execute()
     return result.data if result.data else []
 
+def fetch_daily_totals_range(start_date, end_date):
+    # Aggregated in SQL by the food_log_daily_totals view; days with no entries are absent
+    result = sb.table("food_log_daily_totals").select("*").gte("date", start_date).lte("date", end_date).order("date", desc=False).execute()
+    return result.data if result.data else []
+
 def log_food_consumed(food_id, date, quantity):
     data = {"food_id": food_id, "date": date, "quantity": quantity}
     result = sb.table("food_log").insert(data).execute()
+    bump_log_version(date)
     return result.data[0] if result.data else None
 
 def delete_food_log_entry(entry_id):
     result = sb.table("food_log").delete().eq("id", entry_id).execute()
+    for entry in result.data or []:
+        bump_log_version(entry["date"])
     return result.data
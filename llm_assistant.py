@@ -1,31 +1,366 @@
 import streamlit as st
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from database import (
+    fetch_brands, fetch_food_library, add_brand, add_food_to_library,
+    log_food_consumed
+)
+from nutrients import UnitType, MACRO_FIELDS, nutrient_vector, parse_unit_type
 
-# This is a placeholder for the AI API integration
-# In the future, you can connect to OpenAI, Gemini, or another LLM provider
+UNIT = UnitType.UNIT.value
+WEIGHT_G = UnitType.WEIGHT_G.value
+CACHE_MAX_SIZE = 128
 
-def show_llm_assistant():
+class LLMAssistantError(Exception):
+    # Configuration or backend failures, reported to the user with st.error
+    pass
+
+# --- Description / name normalization ---
+def normalize_text(text):
+    text = re.sub(r"[^a-z0-9.\s]", " ", text.lower())
+    # Keep decimal points ("1.5") but drop full stops
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+# Characters that separate items in a description; they must survive in the
+# cache key because "chicken, curry" and "chicken curry" are different meals
+ITEM_SEPARATORS = r"([,;+\n])"
+
+def normalize_description(description):
+    # Cache key: case, whitespace and other punctuation do not change the meal
+    parts = re.split(ITEM_SEPARATORS, description.lower())
+    return "".join(part if re.fullmatch(ITEM_SEPARATORS, part) else normalize_text(part) for part in parts)
+
+
+# --- Parsing backends ---
+# A backend turns one free-text meal description into a list of item dicts
+# in a single call. Each item has: name, brand, quantity, unit_type,
+# serving_size and the per-serving macros in MACRO_FIELDS.
+
+# Per-serving reference values used by the local stand-in model.
+# Weight-based items are per 100g, matching the food_library convention.
+LOCAL_FOODS = {
+    "rice": (WEIGHT_G, "100g", 28.0, 2.7, 0.3, 0.0, 0.4),
+    "pasta": (WEIGHT_G, "100g", 31.0, 5.8, 0.9, 0.0, 1.8),
+    "chicken breast": (WEIGHT_G, "100g", 0.0, 31.0, 3.6, 0.0, 0.0),
+    "chicken curry": (UNIT, "1 plate", 45.0, 30.0, 15.0, 0.0, 5.0),
+    "salad": (UNIT, "1 bowl", 5.0, 1.5, 0.3, 0.0, 2.0),
+    "egg": (UNIT, "1 egg", 0.6, 6.3, 5.0, 0.0, 0.0),
+    "toast": (UNIT, "1 slice", 13.0, 3.0, 1.0, 0.0, 0.8),
+    "apple": (UNIT, "1 apple", 25.0, 0.5, 0.3, 0.0, 4.4),
+    "banana": (UNIT, "1 banana", 27.0, 1.3, 0.4, 0.0, 3.1),
+    "orange juice": (UNIT, "1 glass", 26.0, 1.7, 0.5, 0.0, 0.5),
+    "beer": (UNIT, "1 pint", 18.0, 1.6, 0.0, 19.0, 0.0),
+}
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "half": 0.5}
+SERVING_WORDS = {"glass", "glasses", "bowl", "bowls", "plate", "plates", "slice", "slices",
+                 "cup", "cups", "can", "cans", "pint", "pints", "piece", "pieces", "small", "large"}
+
+class LocalMealParser:
+    # Deterministic stand-in for an LLM: no network, same input -> same output
+    def parse_meal(self, description):
+        items = []
+        for part in re.split(r",|;|\band\b|\bwith\b|\+|\n", description.lower()):
+            item = self._parse_item(normalize_text(part))
+            if item:
+                items.append(item)
+        return items
+
+    def _parse_item(self, text):
+        if not text:
+            return None
+        words = text.split()
+        quantity = None
+        grams = False
+        match = re.match(r"^(\d+(?:\.\d+)?)\s*(g|grams?)?$", words[0])
+        if match:
+            quantity = float(match.group(1))
+            grams = bool(match.group(2))
+            words = words[1:]
+            if words and words[0] in ("g", "gram", "grams"):
+                grams = True
+                words = words[1:]
+        elif words[0] in NUMBER_WORDS:
+            quantity = float(NUMBER_WORDS[words[0]])
+            words = words[1:]
+        homemade = "homemade" in words
+        words = [w for w in words if w not in SERVING_WORDS and w not in ("of", "homemade")]
+        if not words:
+            return None
+        name = " ".join(words)
+        if name not in LOCAL_FOODS and name.rstrip("s") in LOCAL_FOODS:
+            name = name.rstrip("s")
+        known = LOCAL_FOODS.get(name)
+        if known:
+            unit_type, serving_size, *macros = known
+            brand = "Homemade meal" if homemade else "Generic food"
+        else:
+            unit_type, serving_size, macros = UNIT, "1 serving", [0.0] * len(MACRO_FIELDS)
+            brand = "Homemade meal"
+        if grams:
+            unit_type, serving_size = WEIGHT_G, "100g"
+        if quantity is None:
+            quantity = 100.0 if unit_type == WEIGHT_G else 1.0
+        item = {
+            "name": name.title(),
+            "brand": brand,
+            "quantity": quantity,
+            "unit_type": unit_type,
+            "serving_size": serving_size,
+        }
+        item.update(zip(MACRO_FIELDS, macros))
+        return item
+
+class OpenAIMealParser:
+    # Any OpenAI-compatible chat completions endpoint; one request per meal
+    PROMPT = (
+        "Split the meal description into individual food or drink items. "
+        "Reply with JSON only: {\"items\": [{\"name\", \"brand\", \"quantity\", "
+        "\"unit_type\", \"serving_size\", \"carbs_g\", \"protein_g\", \"fat_g\", "
+        "\"alcohol_g\", \"fibre_g\"}]}. unit_type is \"unit\" (macros per serving, "
+        "quantity in servings) or \"weight (g)\" (macros per 100g, quantity in grams). "
+        "brand is \"Homemade meal\" or \"Generic food\" unless a brand is named."
+    )
+
+    def __init__(self, api_key, model="gpt-4o-mini", base_url="https://api.openai.com/v1"):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+
+    def parse_meal(self, description):
+        body = {
+            "model": self.model,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": self.PROMPT},
+                {"role": "user", "content": description},
+            ],
+        }
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            raise LLMAssistantError(f"LLM request failed with HTTP {e.code}: {e.reason}") from e
+        except (urllib.error.URLError, TimeoutError) as e:
+            raise LLMAssistantError(f"Could not reach the LLM service: {getattr(e, 'reason', e)}") from e
+        except json.JSONDecodeError as e:
+            raise LLMAssistantError("The LLM service returned a response that is not JSON.") from e
+        try:
+            content = json.loads(payload["choices"][0]["message"]["content"])
+            return [clean_item(item) for item in content.get("items", []) if item.get("name")]
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError, AttributeError, ValueError) as e:
+            raise LLMAssistantError(f"Could not understand the LLM reply: {e!r}") from e
+
+# Weight spellings a model is likely to use instead of "weight (g)"; like the
+# legacy 'g'/'ml' library rows, their macros are per 100g/100ml
+WEIGHT_ALIASES = {"g", "gram", "grams", "ml", "millilitre", "millilitres", "milliliter", "milliliters"}
+
+def clean_unit_type(value):
+    if isinstance(value, str) and value.strip().lower() in WEIGHT_ALIASES:
+        return WEIGHT_G
+    try:
+        return parse_unit_type(value).value
+    except ValueError as e:
+        # Guessing 'unit' here could turn 200g into 200 servings
+        raise LLMAssistantError(f"The LLM reply used an unsupported unit type: {e}") from None
+
+def clean_item(item):
+    unit_type = clean_unit_type(item.get("unit_type"))
+    quantity = item.get("quantity")
+    if quantity is None:
+        quantity = 100.0 if unit_type == WEIGHT_G else 1.0
+    cleaned = {
+        "name": str(item["name"]).strip(),
+        "brand": item.get("brand") or "Generic food",
+        "quantity": float(quantity),
+        "unit_type": unit_type,
+        "serving_size": item.get("serving_size") or ("100g" if unit_type == WEIGHT_G else "1 serving"),
+    }
+    for macro in MACRO_FIELDS:
+        cleaned[macro] = float(item.get(macro) or 0)
+    return cleaned
+
+# The app parses with a real model unless LLM_BACKEND says otherwise. 'local'
+# is the offline stand-in for tests and demos; it only knows LOCAL_FOODS
+DEFAULT_BACKEND = "openai"
+
+def _get_setting(key, default=None):
+    return st.secrets[key] if key in st.secrets else os.getenv(key, default)
+
+def _openai_backend():
+    api_key = _get_setting("OPENAI_API_KEY")
+    if not api_key:
+        raise LLMAssistantError("OPENAI_API_KEY is not set. Add it to secrets or set LLM_BACKEND to another backend.")
+    return OpenAIMealParser(
+        api_key,
+        model=_get_setting("LLM_MODEL", "gpt-4o-mini"),
+        base_url=_get_setting("LLM_BASE_URL", "https://api.openai.com/v1"),
+    )
+
+BACKENDS = {
+    "local": lambda: LocalMealParser(),
+    "openai": _openai_backend,
+}
+
+@st.cache_resource
+def get_llm_backend():
+    name = _get_setting("LLM_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise LLMAssistantError(f"Unknown LLM_BACKEND '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+# --- Response cache ---
+class MealParseCache:
+    # LRU cache of parsed items keyed by normalized description. Shared by all
+    # sessions (see get_parse_cache), which run on separate threads, so every
+    # access holds the lock
+    def __init__(self, max_size=CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, description):
+        key = normalize_description(description)
+        with self._lock:
+            items = self._entries.get(key)
+            if items is None:
+                return None
+            self._entries.move_to_end(key)
+        return [dict(item) for item in items]
+
+    def put(self, description, items):
+        key = normalize_description(description)
+        items = [dict(item) for item in items]
+        with self._lock:
+            self._entries[key] = items
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+@st.cache_resource
+def get_parse_cache():
+    return MealParseCache()
+
+def parse_meal(description, backend=None, cache=None):
+    # Returns (items, cache_hit); the whole meal is a single backend call
+    backend = backend or get_llm_backend()
+    cache = cache if cache is not None else get_parse_cache()
+    items = cache.get(description)
+    if items is not None:
+        return items, True
+    items = backend.parse_meal(description)
+    cache.put(description, items)
+    return items, False
+
+
+# --- Matching against food_library ---
+def build_food_index(food_library):
+    # Normalized name -> foods with that name (one per brand)
+    index = {}
+    for food in food_library:
+        index.setdefault(normalize_text(food.get("name", "")), []).append(food)
+    return index
+
+def match_items(items, food_index):
+    # Attach the existing library row to each item where one exists. The
+    # quantity is logged as-is, so only rows measured the same way can match
+    for item in items:
+        candidates = [f for f in food_index.get(normalize_text(item["name"]), []) if f.get("unit_type") == item["unit_type"]]
+        brand = normalize_text(item.get("brand") or "")
+        same_brand = [f for f in candidates if normalize_text((f.get("brands") or {}).get("name", "")) == brand]
+        matches = same_brand or candidates
+        item["food"] = matches[0] if matches else None
+    return items
+
+def needs_confirmation(item):
+    # A new item with no nutrition data would become a zero-calorie library row
+    return item.get("food") is None and not any(item.get(macro) for macro in MACRO_FIELDS)
+
+def log_meal_items(items, log_date, confirmed=()):
+    # Items needing confirmation are skipped unless their index is in confirmed
+    brands = {b["name"].lower(): b for b in fetch_brands()}
+    # Rows created earlier in this meal, so a repeated new item is added once
+    created = {}
+    logged = 0
+    for index, item in enumerate(items):
+        if needs_confirmation(item) and index not in confirmed:
+            continue
+        food = item.get("food") or created.get((normalize_text(item["name"]), item["unit_type"]))
+        if food is None:
+            brand = brands.get(item["brand"].lower())
+            if brand is None:
+                brand = add_brand(item["brand"])
+                brands[item["brand"].lower()] = brand
+            food = add_food_to_library(
+                item["name"], item["carbs_g"], item["protein_g"], item["fat_g"],
+                item["alcohol_g"], item["fibre_g"], item["unit_type"], item["serving_size"], brand["id"]
+            )
+            if food:
+                created[(normalize_text(item["name"]), item["unit_type"])] = food
+        if food:
+            log_food_consumed(food["id"], log_date, item["quantity"])
+            logged += 1
+    return logged
+
+
+def show_llm_assistant(log_date):
     st.subheader("AI Food Description Assistant")
     user_input = st.text_area(
-#       "Describe what you ate (e.g. 'homemade chicken curry with rice, small salad, glass of orange juice')",
-        "This section is not yet set up",
+        "Describe what you ate (e.g. 'homemade chicken curry with rice, small salad, glass of orange juice')",
         height=80,
         key="llm_food_description"
     )
     if st.button("Get Suggestion", key="llm_get_suggestion"):
         if user_input.strip():
-            # Placeholder for LLM API call
-            st.info("[AI] Suggesting food details for: " + user_input)
-            # Example mocked response
-            st.write({
-                "name": "Homemade Chicken Curry",
-                "brand": "Homemade meal",
-                "carbs_g": 45,
-                "protein_g": 30,
-                "fat_g": 15,
-                "fibre_g": 5,
-                "alcohol_g": 0,
-                "serving_size": "1 plate",
-                "unit_type": "unit"
-            })
+            try:
+                items, cache_hit = parse_meal(user_input)
+            except LLMAssistantError as e:
+                st.session_state.pop("llm_items", None)
+                st.error(str(e))
+            else:
+                st.session_state.llm_items = items
+                st.session_state.llm_cache_hit = cache_hit
         else:
+            st.session_state.pop("llm_items", None)
             st.warning("Please enter a description of what you ate.")
+
+    items = st.session_state.get("llm_items")
+    if not items:
+        return
+    if st.session_state.get("llm_cache_hit"):
+        st.caption("Loaded from cache.")
+    items = match_items(items, build_food_index(fetch_food_library()))
+    confirmed = set()
+    for index, item in enumerate(items):
+        unit_display = "g" if item["unit_type"] == WEIGHT_G else "units"
+        per_display = "per 100g" if item["unit_type"] == WEIGHT_G else "per serving"
+        status = "in library" if item["food"] else "new item"
+        # Matched items are logged with the library row's macros, so show those
+        macros = {macro: float((item["food"] or item).get(macro) or 0) for macro in MACRO_FIELDS}
+        kcal = nutrient_vector(macros, item["unit_type"])["kcal_per_qty"] * item["quantity"]
+        st.write(f"**{item['name']}** ({item['brand']}) - {item['quantity']:g} {unit_display} · {kcal:.0f} kcal · _{status}_")
+        st.write(f"Carbs: {macros['carbs_g']:.1f}g | Protein: {macros['protein_g']:.1f}g | Fat: {macros['fat_g']:.1f}g | Fibre: {macros['fibre_g']:.1f}g | Alcohol: {macros['alcohol_g']:.1f}g ({per_display})")
+        if needs_confirmation(item):
+            st.warning(f"No nutrition data found for '{item['name']}'.")
+            if st.checkbox(f"Add '{item['name']}' to the library with zero macros", key=f"llm_confirm_{index}"):
+                confirmed.add(index)
+    if st.button("Log all items", key="llm_log_all"):
+        logged = log_meal_items(items, log_date, confirmed)
+        st.session_state.pop("llm_items", None)
+        st.success(f"Logged {logged} of {len(items)} item(s) for {log_date}.")
+        st.rerun()
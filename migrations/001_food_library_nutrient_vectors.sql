@@ -0,0 +1,66 @@
+-- Precomputed per-quantity nutrient vectors on food_library.
+--
+-- unit_type becomes an enum. The *_per_qty columns hold the amount per one
+-- unit of food_log.quantity: per unit for 'unit' items, and per gram for
+-- 'weight (g)' items (whose macros are entered per 100g). Daily totals are
+-- then sum(quantity * vector) with no unit_type branching.
+
+begin;
+
+-- Older rows used bare 'g'/'ml'; their macros are per 100g/100ml
+update food_library
+set unit_type = 'weight (g)'
+where unit_type in ('g', 'ml');
+
+-- Anything else cannot be converted safely: stop and list the rows to fix by hand
+do $$
+declare
+    bad text;
+begin
+    select string_agg(format('id=%s name=%L unit_type=%L', id, name, unit_type), '; ' order by id)
+    into bad
+    from food_library
+    where unit_type is null or unit_type not in ('unit', 'weight (g)');
+    if bad is not null then
+        raise exception 'food_library rows with unknown unit_type: %', bad;
+    end if;
+end $$;
+
+create type unit_type as enum ('unit', 'weight (g)');
+
+alter table food_library
+    alter column unit_type type unit_type using unit_type::unit_type,
+    alter column unit_type set not null;
+
+-- Generated from the macros so they stay correct however a row is written or
+-- edited; 'weight (g)' macros are per 100g, 'unit' macros per serving
+alter table food_library
+    add column carbs_g_per_qty double precision not null generated always as
+        (coalesce(carbs_g, 0) / case unit_type when 'weight (g)' then 100 else 1 end) stored,
+    add column protein_g_per_qty double precision not null generated always as
+        (coalesce(protein_g, 0) / case unit_type when 'weight (g)' then 100 else 1 end) stored,
+    add column fat_g_per_qty double precision not null generated always as
+        (coalesce(fat_g, 0) / case unit_type when 'weight (g)' then 100 else 1 end) stored,
+    add column alcohol_g_per_qty double precision not null generated always as
+        (coalesce(alcohol_g, 0) / case unit_type when 'weight (g)' then 100 else 1 end) stored,
+    add column fibre_g_per_qty double precision not null generated always as
+        (coalesce(fibre_g, 0) / case unit_type when 'weight (g)' then 100 else 1 end) stored,
+    add column kcal_per_qty double precision not null generated always as
+        ((coalesce(carbs_g, 0) * 4 + coalesce(protein_g, 0) * 4
+          + coalesce(fat_g, 0) * 9 + coalesce(alcohol_g, 0) * 7)
+         / case unit_type when 'weight (g)' then 100 else 1 end) stored;
+
+-- Daily totals computed in SQL, used by the Nutrition Graph page
+create or replace view food_log_daily_totals as
+select l.date,
+       sum(l.quantity * f.kcal_per_qty) as calories,
+       sum(l.quantity * f.carbs_g_per_qty) as carbs_g,
+       sum(l.quantity * f.protein_g_per_qty) as protein_g,
+       sum(l.quantity * f.fat_g_per_qty) as fat_g,
+       sum(l.quantity * f.alcohol_g_per_qty) as alcohol_g,
+       sum(l.quantity * f.fibre_g_per_qty) as fibre_g
+from food_log l
+join food_library f on f.id = l.food_id
+group by l.date;
+
+commit;
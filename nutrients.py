@@ -0,0 +1,31 @@
+from enum import Enum
+
+class UnitType(str, Enum):
+    UNIT = "unit"
+    WEIGHT_G = "weight (g)"
+
+# Macros are entered per serving for unit items and per 100g for weight items;
+# this is how much logged quantity that reference amount corresponds to
+REFERENCE_QUANTITY = {UnitType.UNIT: 1.0, UnitType.WEIGHT_G: 100.0}
+
+MACRO_FIELDS = ["carbs_g", "protein_g", "fat_g", "alcohol_g", "fibre_g"]
+KCAL_PER_GRAM = {"carbs_g": 4, "protein_g": 4, "fat_g": 9, "alcohol_g": 7, "fibre_g": 0}
+
+# Totals produced from a log entry, and the food_library columns holding the
+# matching amount per one unit of logged quantity (per unit or per gram)
+NUTRIENT_FIELDS = MACRO_FIELDS + ["calories"]
+VECTOR_FIELDS = [f"{macro}_per_qty" for macro in MACRO_FIELDS] + ["kcal_per_qty"]
+
+def parse_unit_type(value):
+    try:
+        return UnitType(value)
+    except ValueError:
+        raise ValueError(f"Unknown unit type '{value}'. Expected one of: {', '.join(u.value for u in UnitType)}") from None
+
+def nutrient_vector(macros, unit_type):
+    # Display-side mirror of the generated *_per_qty columns in food_library,
+    # for items that are not stored yet. macros are per serving / per 100g
+    reference = REFERENCE_QUANTITY[parse_unit_type(unit_type)]
+    vector = {f"{macro}_per_qty": float(macros.get(macro) or 0) / reference for macro in MACRO_FIELDS}
+    vector["kcal_per_qty"] = sum(vector[f"{macro}_per_qty"] * KCAL_PER_GRAM[macro] for macro in MACRO_FIELDS)
+    return vector
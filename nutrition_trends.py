@@ -0,0 +1,80 @@
+import streamlit as st
+import pandas as pd
+from collections import OrderedDict
+from datetime import timedelta
+from database import fetch_daily_totals_range, get_log_lock, get_log_versions
+from nutrients import NUTRIENT_FIELDS
+
+# Upper bound on cached days; the least recently requested days go first
+TRENDS_CACHE_MAX_DAYS = 3 * 366
+
+# Trends cache: date string -> (log version, daily totals dict), in LRU order.
+# A day is only refetched when it is missing or its version has moved on.
+# Shared across sessions, so reads and writes hold get_log_lock()
+@st.cache_resource
+def get_trends_cache():
+    return OrderedDict()
+
+def clear_trends_cache():
+    with get_log_lock():
+        get_trends_cache().clear()
+
+def _day_totals(date_str, row=None):
+    totals = {"date": date_str}
+    totals.update({field: float((row or {}).get(field) or 0) for field in NUTRIENT_FIELDS})
+    return totals
+
+def _contiguous_runs(dates):
+    # Group sorted dates into (first, last) spans so each gap is one query
+    runs = []
+    for date in dates:
+        if runs and date - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = date
+        else:
+            runs.append([date, date])
+    return runs
+
+def fetch_daily_totals(start_date, end_date):
+    cache = get_trends_cache()
+    versions = get_log_versions()
+    days = [d.strftime("%Y-%m-%d") for d in pd.date_range(start=start_date, end=end_date, freq='D')]
+
+    totals = {}
+    stale = {}
+    with get_log_lock():
+        for date_str in days:
+            version = versions.get(date_str, 0)
+            cached = cache.get(date_str)
+            if cached is None or cached[0] != version:
+                # Record the version seen before fetching, so a write racing the
+                # fetch leaves the day stale rather than caching old data as new
+                stale[pd.Timestamp(date_str).date()] = version
+            else:
+                totals[date_str] = cached[1]
+
+    # Fetch outside the lock so one session's queries don't block the others
+    fetched = {}
+    for run_start, run_end in _contiguous_runs(sorted(stale)):
+        rows_by_day = {row["date"]: row for row in fetch_daily_totals_range(run_start.strftime("%Y-%m-%d"), run_end.strftime("%Y-%m-%d"))}
+        day = run_start
+        while day <= run_end:
+            date_str = day.strftime("%Y-%m-%d")
+            fetched[date_str] = (stale[day], _day_totals(date_str, rows_by_day.get(date_str)))
+            totals[date_str] = fetched[date_str][1]
+            day += timedelta(days=1)
+
+    with get_log_lock():
+        for date_str, entry in fetched.items():
+            cached = cache.get(date_str)
+            # Don't overwrite a newer result stored by another session meanwhile
+            if cached is None or cached[0] <= entry[0]:
+                cache[date_str] = entry
+        for date_str in days:
+            if date_str in cache:
+                cache.move_to_end(date_str)
+        while len(cache) > TRENDS_CACHE_MAX_DAYS:
+            cache.popitem(last=False)
+
+    df_trends = pd.DataFrame([totals[date_str] for date_str in days], columns=["date"] + NUTRIENT_FIELDS)
+    df_trends['date'] = pd.to_datetime(df_trends['date'])
+    return df_trends
@@ -7,6 +7,7 @@ import os
 # Add parent directory to path to import database functions
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import fetch_food_log, delete_food_log_entry
+from nutrients import UnitType, NUTRIENT_FIELDS, VECTOR_FIELDS
 
 st.set_page_config(page_title="Today's Food Log", layout="centered")
 st.title("📊 Today's Food Log")
@@ -72,37 +73,17 @@ if food_log:
                 brand_names.append("No brand")
         df_log["brand_name"] = brand_names
     
-    # Calculate macros per entry based on unit_type and compute calories
-    for idx, row in df_log.iterrows():
-        unit_type = row.get("unit_type", "unit")
-        quantity = row["quantity"]
-        if unit_type == "unit":
-            factor = quantity
-        elif unit_type == "weight (g)":
-            factor = quantity / 100.0
-        else:
-            # Default to unit if unit_type is unclear
-            factor = quantity
-        
-        debug_macros = {}
-        for macro in ["carbs_g", "protein_g", "fat_g", "alcohol_g", "fibre_g"]:
-            debug_macros[macro] = float(row.get(macro, 0)) * factor
-            df_log.at[idx, macro] = debug_macros[macro]
-        
-        calories = (
-            debug_macros["carbs_g"] * 4 +
-            debug_macros["protein_g"] * 4 +
-            debug_macros["fat_g"] * 9 +
-            debug_macros["alcohol_g"] * 7
-        )
-        df_log.at[idx, "calories"] = calories
+    # Scale each entry's precomputed nutrient vector by the quantity logged;
+    # entries whose food_library row is missing count as zero
+    vectors = pd.DataFrame([entry.get("food_library") or {} for entry in food_log], columns=VECTOR_FIELDS).fillna(0.0)
+    df_log[NUTRIENT_FIELDS] = vectors.mul(df_log["quantity"], axis=0).to_numpy()
 
     # Display entries with delete buttons
     st.subheader("Entries:")
     for idx, row in df_log.iterrows():
         col1, col2 = st.columns([4, 1])
         with col1:
-            unit_display = "g" if row.get('unit_type') == "weight (g)" else "units"
+            unit_display = "g" if row.get('unit_type') == UnitType.WEIGHT_G else "units"
             st.write(f"**{row['name']}** ({row.get('brand_name', 'No brand')}) - {row['quantity']} {unit_display}")
             st.write(f"Calories: {row['calories']:.0f} | Carbs: {row['carbs_g']:.1f}g | Protein: {row['protein_g']:.1f}g | Fat: {row['fat_g']:.1f}g | Fibre: {row['fibre_g']:.1f}g")
             # Debug info
@@ -117,7 +98,7 @@ if food_log:
         st.markdown("---")
     
     # Daily totals
-    totals = {macro: df_log[macro].sum() for macro in ["carbs_g", "protein_g", "fat_g", "alcohol_g", "fibre_g", "calories"]}
+    totals = {field: df_log[field].sum() for field in NUTRIENT_FIELDS}
     st.markdown(f"**Daily Totals:**")
     st.markdown(
         f"Calories: {totals['calories']:.0f} kcal | Carbs: {totals['carbs_g']:.1f}g | Protein: {totals['protein_g']:.1f}g | Fat: {totals['fat_g']:.1f}g | Fibre: {totals['fibre_g']:.1f}g | Alcohol: {totals['alcohol_g']:.1f}g"
@@ -8,7 +8,7 @@ import os
 
 # Add parent directory to path to import database functions
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import fetch_food_log
+from nutrition_trends import fetch_daily_totals, clear_trends_cache
 
 st.set_page_config(page_title="Nutrition Graph", layout="wide")
 st.title("📈 Nutrition Trends")
@@ -20,74 +20,13 @@ with col1:
 with col2:
     end_date = st.date_input("End Date", value=datetime.now())
 
+# Changes made outside this app are not tracked by the per-day versions
+if st.button("Refresh data"):
+    clear_trends_cache()
+
 if start_date <= end_date:
-    # Generate date range
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-    
-    # Collect data for each date
-    daily_data = []
-    for date in date_range:
-        date_str = date.strftime("%Y-%m-%d")
-        food_log = fetch_food_log(date_str)
-        
-        if food_log:
-            df_log = pd.DataFrame(food_log)
-            # Process the data similar to the food log page
-            if "food_library" in df_log.columns:
-                lib_df = pd.json_normalize(df_log["food_library"])
-                for col in ["name", "carbs_g", "protein_g", "fat_g", "alcohol_g", "fibre_g", "unit_type"]:
-                    if col in lib_df.columns:
-                        df_log[col] = lib_df[col]
-                
-                # Calculate macros per entry
-                for idx, row in df_log.iterrows():
-                    unit_type = row.get("unit_type", "unit")
-                    quantity = row["quantity"]
-                    if unit_type == "unit":
-                        factor = quantity
-                    elif unit_type == "weight (g)":
-                        factor = quantity / 100.0
-                    else:
-                        factor = quantity
-                    
-                    for macro in ["carbs_g", "protein_g", "fat_g", "alcohol_g", "fibre_g"]:
-                        df_log.at[idx, macro] = float(row.get(macro, 0)) * factor
-                    
-                    calories = (
-                        df_log.at[idx, "carbs_g"] * 4 +
-                        df_log.at[idx, "protein_g"] * 4 +
-                        df_log.at[idx, "fat_g"] * 9 +
-                        df_log.at[idx, "alcohol_g"] * 7
-                    )
-                    df_log.at[idx, "calories"] = calories
-                
-                # Sum totals for the day
-                daily_totals = {
-                    "date": date_str,
-                    "calories": df_log["calories"].sum(),
-                    "carbs_g": df_log["carbs_g"].sum(),
-                    "protein_g": df_log["protein_g"].sum(),
-                    "fat_g": df_log["fat_g"].sum(),
-                    "fibre_g": df_log["fibre_g"].sum(),
-                    "alcohol_g": df_log["alcohol_g"].sum()
-                }
-        else:
-            # No data for this date
-            daily_totals = {
-                "date": date_str,
-                "calories": 0,
-                "carbs_g": 0,
-                "protein_g": 0,
-                "fat_g": 0,
-                "fibre_g": 0,
-                "alcohol_g": 0
-            }
-        
-        daily_data.append(daily_totals)
-    
-    # Create DataFrame for plotting
-    df_trends = pd.DataFrame(daily_data)
-    df_trends['date'] = pd.to_datetime(df_trends['date'])
+    # Per-day totals come from the trends cache; only new or changed days are fetched
+    df_trends = fetch_daily_totals(start_date, end_date)
     
     # Display charts
     if not df_trends.empty:
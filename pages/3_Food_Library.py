@@ -6,6 +6,7 @@ import os
 # Add parent directory to path to import database functions
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import fetch_food_library
+from nutrients import UnitType
 
 st.set_page_config(page_title="Food & Drink Library", layout="wide")
 st.title("📚 Food & Drink Library")
@@ -88,11 +89,11 @@ if food_library:
             st.metric("Total Items", total_items)
         
         with col2:
-            unit_items = len(filtered_df[filtered_df["unit_type"] == "unit"])
+            unit_items = len(filtered_df[filtered_df["unit_type"] == UnitType.UNIT.value])
             st.metric("Unit-based Items", unit_items)
         
         with col3:
-            weight_items = len(filtered_df[filtered_df["unit_type"] == "weight (g)"])
+            weight_items = len(filtered_df[filtered_df["unit_type"] == UnitType.WEIGHT_G.value])
             st.metric("Weight-based Items", weight_items)
         
         with col4:
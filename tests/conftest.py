@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+import types
+
+# database.py connects to Supabase on import; the logic under test doesn't
+# need it, so tests use a stand-in and patch in the query functions they use
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared state that database.py keeps in st.cache_resource
+LOG_VERSIONS = {}
+LOG_LOCK = threading.Lock()
+
+
+def get_log_versions():
+    return LOG_VERSIONS
+
+
+def get_log_lock():
+    return LOG_LOCK
+
+
+sys.modules.setdefault("database", types.SimpleNamespace(
+    fetch_brands=None, fetch_food_library=None, add_brand=None,
+    add_food_to_library=None, log_food_consumed=None, fetch_daily_totals_range=None,
+    get_log_versions=get_log_versions,
+    get_log_lock=get_log_lock,
+))
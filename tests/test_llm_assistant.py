@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+import llm_assistant
+from llm_assistant import (
+    LLMAssistantError, LocalMealParser, MealParseCache, build_food_index,
+    clean_item, log_meal_items, match_items, needs_confirmation, normalize_description,
+    parse_meal,
+)
+
+
+class CountingParser(LocalMealParser):
+    def __init__(self):
+        self.calls = 0
+
+    def parse_meal(self, description):
+        self.calls += 1
+        return super().parse_meal(description)
+
+
+def test_local_parser_splits_meal_into_items():
+    items = LocalMealParser().parse_meal("Homemade chicken curry with 150g rice, small salad + 2 eggs")
+    assert [item["name"] for item in items] == ["Chicken Curry", "Rice", "Salad", "Egg"]
+    assert items[0]["brand"] == "Homemade meal"
+    assert (items[1]["quantity"], items[1]["unit_type"]) == (150.0, "weight (g)")
+    assert items[3]["quantity"] == 2.0
+
+
+def test_local_parser_is_deterministic():
+    parser = LocalMealParser()
+    assert parser.parse_meal("toast and beer") == parser.parse_meal("toast and beer")
+
+
+def test_separators_survive_in_cache_key():
+    assert normalize_description("chicken, curry") != normalize_description("chicken curry")
+    assert normalize_description("Chicken  Curry!") == normalize_description("chicken curry")
+
+    parser, cache = CountingParser(), MealParseCache()
+    split_items, _ = parse_meal("chicken, curry", parser, cache)
+    items, hit = parse_meal("chicken curry", parser, cache)
+    assert not hit
+    assert [item["name"] for item in split_items] == ["Chicken", "Curry"]
+    assert [item["name"] for item in items] == ["Chicken Curry"]
+
+
+def test_cache_hit_skips_backend():
+    parser, cache = CountingParser(), MealParseCache()
+    first, hit = parse_meal("2 eggs, toast", parser, cache)
+    assert not hit
+    second, hit = parse_meal("2 Eggs,  toast.", parser, cache)
+    assert hit
+    assert second == first
+    assert parser.calls == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = MealParseCache(max_size=2)
+    cache.put("apple", [{"name": "Apple"}])
+    cache.put("banana", [{"name": "Banana"}])
+    assert cache.get("apple") is not None  # apple is now most recently used
+    cache.put("beer", [{"name": "Beer"}])
+    assert len(cache) == 2
+    assert cache.get("banana") is None
+    assert cache.get("apple") is not None
+    assert cache.get("beer") is not None
+
+
+def test_cache_returns_copies():
+    cache = MealParseCache()
+    cache.put("apple", [{"name": "Apple"}])
+    cache.get("apple")[0]["name"] = "Changed"
+    assert cache.get("apple") == [{"name": "Apple"}]
+
+
+LIBRARY = [
+    {"id": 1, "name": "Rice", "unit_type": "unit", "brands": {"name": "Generic food"}},
+    {"id": 2, "name": "Rice", "unit_type": "weight (g)", "brands": {"name": "Uncle Ben's"}},
+    {"id": 3, "name": "Rice", "unit_type": "weight (g)", "brands": {"name": "Generic food"}},
+    {"id": 4, "name": "Salad", "unit_type": "unit", "brands": {"name": "Tesco"}},
+]
+
+
+def test_match_prefers_same_brand_and_unit_type():
+    items = match_items(LocalMealParser().parse_meal("200g rice"), build_food_index(LIBRARY))
+    assert items[0]["food"]["id"] == 3
+
+
+def test_match_falls_back_to_other_brand_with_same_unit_type():
+    items = match_items(LocalMealParser().parse_meal("salad"), build_food_index(LIBRARY))
+    assert items[0]["food"]["id"] == 4
+
+
+def test_match_rejects_different_unit_type():
+    library = [food for food in LIBRARY if food["unit_type"] == "unit"]
+    items = match_items(LocalMealParser().parse_meal("200g rice"), build_food_index(library))
+    assert items[0]["food"] is None
+
+
+def test_unknown_items_need_confirmation():
+    items = match_items(LocalMealParser().parse_meal("mystery stew, apple"), build_food_index(LIBRARY))
+    assert needs_confirmation(items[0])
+    assert not needs_confirmation(items[1])
+
+
+def test_clean_item_maps_grams_to_weight():
+    item = clean_item({"name": "Rice", "unit_type": "g", "quantity": 200, "carbs_g": 28, "protein_g": 2.7})
+    assert item["unit_type"] == "weight (g)"
+    assert item["quantity"] == 200.0
+
+
+def test_clean_item_rejects_unknown_unit_type():
+    with pytest.raises(LLMAssistantError, match="slice"):
+        clean_item({"name": "Toast", "unit_type": "slice", "quantity": 2})
+
+
+def test_clean_item_keeps_explicit_zero_quantity():
+    assert clean_item({"name": "Beer", "unit_type": "unit", "quantity": 0})["quantity"] == 0.0
+    assert clean_item({"name": "Beer", "unit_type": "unit"})["quantity"] == 1.0
+    assert clean_item({"name": "Rice", "unit_type": "weight (g)"})["quantity"] == 100.0
+
+
+def test_cache_is_safe_across_threads():
+    cache = MealParseCache(max_size=4)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                description = f"item {(i + offset) % 8}"
+                cache.put(description, [{"name": description}])
+                cache.get(f"item {(i + offset + 1) % 8}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(cache) == 4
+
+
+def test_repeated_new_item_creates_one_library_row(monkeypatch):
+    created, logged = [], []
+
+    def add_food_to_library(name, *args):
+        created.append(name)
+        return {"id": 100 + len(created), "name": name}
+
+    monkeypatch.setattr(llm_assistant, "fetch_brands", lambda: [{"id": 1, "name": "Generic food"}])
+    monkeypatch.setattr(llm_assistant, "add_brand", lambda name: {"id": 2, "name": name})
+    monkeypatch.setattr(llm_assistant, "add_food_to_library", add_food_to_library)
+    monkeypatch.setattr(llm_assistant, "log_food_consumed", lambda food_id, date, quantity: logged.append((food_id, quantity)))
+
+    items = match_items(LocalMealParser().parse_meal("apple, banana, 2 apples"), build_food_index([]))
+    assert log_meal_items(items, "2025-01-01") == 3
+    assert created == ["Apple", "Banana"]
+    assert logged == [(101, 1.0), (102, 1.0), (101, 2.0)]
@@ -0,0 +1,20 @@
+import pytest
+
+from nutrients import UnitType, nutrient_vector, parse_unit_type
+
+
+def test_weight_vector_is_per_gram():
+    vector = nutrient_vector({"carbs_g": 28, "protein_g": 2.7, "fat_g": 0.3, "fibre_g": 0.4}, "weight (g)")
+    assert vector["carbs_g_per_qty"] == pytest.approx(0.28)
+    assert vector["kcal_per_qty"] == pytest.approx((28 * 4 + 2.7 * 4 + 0.3 * 9) / 100)
+
+
+def test_unit_vector_is_per_serving():
+    vector = nutrient_vector({"carbs_g": 18, "alcohol_g": 19}, UnitType.UNIT)
+    assert vector["alcohol_g_per_qty"] == 19
+    assert vector["kcal_per_qty"] == 18 * 4 + 19 * 7
+
+
+def test_unknown_unit_type_is_rejected():
+    with pytest.raises(ValueError, match="slice"):
+        parse_unit_type("slice")
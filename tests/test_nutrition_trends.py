@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+import nutrition_trends
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    calls = []
+
+    def fetch_daily_totals_range(start_date, end_date):
+        calls.append((start_date, end_date))
+        return [{"date": start_date, "calories": 100.0, "carbs_g": 25.0}]
+
+    monkeypatch.setattr(nutrition_trends, "fetch_daily_totals_range", fetch_daily_totals_range)
+    nutrition_trends.clear_trends_cache()
+    nutrition_trends.get_log_versions().clear()
+    return calls
+
+
+def test_only_new_days_are_fetched(queries):
+    df = nutrition_trends.fetch_daily_totals(date(2025, 1, 1), date(2025, 12, 31))
+    assert len(df) == 365
+    assert queries == [("2025-01-01", "2025-12-31")]
+    assert df.loc[0, "calories"] == 100.0
+    assert df.loc[1, "calories"] == 0.0
+
+    queries.clear()
+    df = nutrition_trends.fetch_daily_totals(date(2025, 1, 8), date(2026, 1, 7))
+    assert len(df) == 365
+    assert queries == [("2026-01-01", "2026-01-07")]
+
+
+def test_written_day_is_refetched(queries):
+    nutrition_trends.fetch_daily_totals(date(2025, 3, 1), date(2025, 3, 10))
+    queries.clear()
+    nutrition_trends.get_log_versions()["2025-03-05"] = 1
+    nutrition_trends.fetch_daily_totals(date(2025, 3, 1), date(2025, 3, 10))
+    assert queries == [("2025-03-05", "2025-03-05")]
+
+
+def test_cache_is_bounded(queries, monkeypatch):
+    monkeypatch.setattr(nutrition_trends, "TRENDS_CACHE_MAX_DAYS", 10)
+    nutrition_trends.fetch_daily_totals(date(2025, 1, 1), date(2025, 1, 10))
+    nutrition_trends.fetch_daily_totals(date(2025, 1, 6), date(2025, 1, 15))
+    cache = nutrition_trends.get_trends_cache()
+    assert len(cache) == 10
+    assert list(cache)[0] == "2025-01-06"